@@ -1,7 +1,60 @@
 from django.contrib import admin
 
 # Register your models here.
-from .models import Compound, ScalarProperty, TextProperty
+from .models import Compound, PropertyName, ScalarProperty, TextProperty, ImportJob, CompoundChange
+from .changes import delete_compounds, record_upsert
 
-admin.site.register([Compound, ScalarProperty, TextProperty])
 
+class CompoundAdmin(admin.ModelAdmin):
+    """
+      Log the changes made through the admin for /data/changes/
+    """
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        record_upsert(obj)
+
+    def delete_model(self, request, obj):
+        delete_compounds(Compound.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        delete_compounds(queryset)
+
+
+class PropertyAdmin(admin.ModelAdmin):
+    """
+      Editing a property changes its compound, log it for /data/changes/
+    """
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        record_upsert(obj.compound)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        record_upsert(obj.compound)
+
+    def delete_queryset(self, request, queryset):
+        compounds = list(Compound.objects.filter(pk__in=queryset.values_list("compound_id", flat=True)))
+        super().delete_queryset(request, queryset)
+        for compound in compounds:
+            record_upsert(compound)
+
+
+class PropertyNameAdmin(admin.ModelAdmin):
+    """
+      Every process caches the ids of the property names (see PropertyNameManager),
+      so they can be looked at, but never changed or deleted.
+    """
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+admin.site.register(Compound, CompoundAdmin)
+admin.site.register([ScalarProperty, TextProperty], PropertyAdmin)
+admin.site.register(PropertyName, PropertyNameAdmin)
+admin.site.register([ImportJob, CompoundChange])
@@ -0,0 +1,89 @@
+from collections import OrderedDict
+
+from django.db import connection, transaction
+
+from api.filters import process_projection
+from api.models import Compound, CompoundChange
+
+
+def _lock_log():
+    """
+      The ids of the log are the tokens of /data/changes/, so they must become visible in order:
+      a reader that has seen id N+1 must never find id N appearing later.
+      On PostgreSQL ids are handed out at insert time, but only become visible at commit time,
+      so the writers take turns on the log, holding a lock until their transaction commits
+      (readers are not blocked). SQLite already allows a single writer at a time.
+      Other databases get no guarantee.
+    """
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("LOCK TABLE {} IN EXCLUSIVE MODE".format(
+                connection.ops.quote_name(CompoundChange._meta.db_table)))
+
+
+def record_upsert(compound):
+    """
+      Log that the compound was inserted or updated.
+    """
+    with transaction.atomic():
+        _lock_log()
+        CompoundChange.objects.create(compound_id=compound.pk, action=CompoundChange.UPSERT)
+
+
+def delete_compounds(compounds, batch_size=1000):
+    """
+      Delete the compounds in the QuerySet, logging a delete for each of them.
+      Every code path removing compounds should go through here, or the replicas will never know.
+    """
+    with transaction.atomic():
+        _lock_log()
+        batch = []
+        for pk in compounds.values_list("pk", flat=True).iterator():
+            batch.append(CompoundChange(compound_id=pk, action=CompoundChange.DELETE))
+            if len(batch) == batch_size:
+                CompoundChange.objects.bulk_create(batch)
+                batch = []
+        CompoundChange.objects.bulk_create(batch)
+        compounds.delete()
+
+
+def read_changes(since, limit):
+    """
+        Inputs:
+          - since:  The token returned by the previous call (0 to start from scratch)
+          - limit:  Maximum number of log entries to read
+        Output:
+          - A page of changes, with the following format:
+            changes = {
+                "since": 0,
+                "next": 1234,       # token to pass as since in the next call
+                "more": True,       # whether there are more changes after next
+                "compounds": [...], # current state of the compounds inserted or updated, with their id
+                "deleted": [...]    # ids of the compounds deleted
+            }
+    """
+    entries = list(
+        CompoundChange.objects.filter(pk__gt=since).order_by("pk")
+        .values_list("pk", "compound_id", "action")[:limit + 1]
+    )
+    more = len(entries) > limit
+    entries = entries[:limit]
+
+    # only the last change of each compound in the page matters
+    actions = OrderedDict()
+    for _, compound_id, action in entries:
+        actions.pop(compound_id, None)
+        actions[compound_id] = action
+
+    upserted = [pk for pk, action in actions.items() if action == CompoundChange.UPSERT]
+    compounds = process_projection(Compound.objects.filter(pk__in=upserted)).in_bulk()
+    # a compound upserted in this page, and deleted in a later one, is already gone
+    deleted = [pk for pk, action in actions.items() if action == CompoundChange.DELETE or pk not in compounds]
+
+    return {
+        "since": since,
+        "next": entries[-1][0] if entries else since,
+        "more": more,
+        "compounds": [compounds[pk] for pk in upserted if pk in compounds],
+        "deleted": deleted,
+    }
@@ -0,0 +1,82 @@
+import csv
+import io
+import itertools
+import json
+import zlib
+
+from django.conf import settings
+
+from api.models import Compound
+from api.filters import process_projection
+from api.serializers import CompoundSerializer
+
+
+def iter_compounds(chunk_size=None):
+    """
+      Iterate over all the compounds in the database, chunk_size at a time.
+      Each chunk is a keyset query (pk greater than the last one seen), with the properties
+      prefetched for that chunk only, so memory use doesn't grow with the size of the database.
+    """
+    if chunk_size is None:
+        chunk_size = getattr(settings, "EXPORT_CHUNK_SIZE", 1000)
+
+    last_pk = 0
+    while True:
+        chunk = list(process_projection(Compound.objects.filter(pk__gt=last_pk).order_by("pk")[:chunk_size]))
+        if not chunk:
+            return
+        for compound in chunk:
+            yield compound
+        last_pk = chunk[-1].pk
+
+
+def csv_lines(compounds):
+    """
+      Write the compounds in the layout read by tests/local_utils.csv_to_compounds:
+
+          compound_name, prop_name_1, prop_value_1, prop_name_2, prop_value_2, ...
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    rows = ([compound.compound] + [x for prop in compound.properties for x in (prop.name, prop.value)]
+            for compound in compounds)
+    for row in itertools.chain([["Chemical formula", "Property name", "Property value"]], rows):
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def ndjson_lines(compounds):
+    """
+      One CompoundSerializer object per line.
+    """
+    for compound in compounds:
+        yield json.dumps(CompoundSerializer(compound).data) + "\n"
+
+
+def gzip_stream(lines):
+    """
+      Gzip compress a stream of text lines on the fly.
+    """
+    # wbits=31 produces a gzip header and trailer, rather than a bare zlib stream
+    compressor = zlib.compressobj(wbits=31)
+    for line in lines:
+        data = compressor.compress(line.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# name: (content type, file extension, function producing the stream)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv", lambda compounds: (line.encode() for line in csv_lines(compounds))),
+    "ndjson": ("application/gzip", "ndjson.gz", lambda compounds: gzip_stream(ndjson_lines(compounds))),
+}
+
+
+def export_stream(output, chunk_size=None):
+    """
+      Stream of bytes with all the compounds in the database, in the given output format.
+    """
+    return EXPORT_FORMATS[output][2](iter_compounds(chunk_size))
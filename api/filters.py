@@ -1,5 +1,5 @@
-from django.db.models import Q
-from api.models import Compound, ScalarProperty, TextProperty
+from django.db.models import Prefetch, Q
+from api.models import Compound, PropertyName, ScalarProperty, TextProperty
 from api.utils import sanitize_value
 
 
@@ -62,18 +62,19 @@ def process_filter(compounds, query):
 def _scalarPropertyFilter(QS, property):
     logic = property["logic"].lower()
     value = float(property["value"])
-    name = property["name"]
+    # an unknown name resolves to None, which no property row matches
+    name_id = PropertyName.objects.get_id(property["name"])
 
     if logic=="gt":
-        pks = ScalarProperty.objects.filter(name=name, value__gt=value).values_list("compound__pk",flat=True)
+        pks = ScalarProperty.objects.filter(property_name_id=name_id, value__gt=value).values_list("compound__pk",flat=True)
     elif logic=="lt":
-        pks = ScalarProperty.objects.filter(name=name, value__lt=value).values_list("compound__pk",flat=True)
+        pks = ScalarProperty.objects.filter(property_name_id=name_id, value__lt=value).values_list("compound__pk",flat=True)
     elif logic=="gte":
-        pks = ScalarProperty.objects.filter(name=name, value__gte=value).values_list("compound__pk",flat=True)
+        pks = ScalarProperty.objects.filter(property_name_id=name_id, value__gte=value).values_list("compound__pk",flat=True)
     elif logic=="lte":
-        pks = ScalarProperty.objects.filter(name=name, value__lte=value).values_list("compound__pk",flat=True)
+        pks = ScalarProperty.objects.filter(property_name_id=name_id, value__lte=value).values_list("compound__pk",flat=True)
     elif logic=="eq":
-        pks = ScalarProperty.objects.filter(name=name, value=value).values_list("compound__pk",flat=True)
+        pks = ScalarProperty.objects.filter(property_name_id=name_id, value=value).values_list("compound__pk",flat=True)
     else:
         return
     QS.add(Q(pk__in=pks), Q.AND)
@@ -83,12 +84,13 @@ def _scalarPropertyFilter(QS, property):
 def _textPropertyFilter(QS, property):
     logic = property["logic"].lower()
     value = property["value"]
-    name = property["name"]
+    # an unknown name resolves to None, which no property row matches
+    name_id = PropertyName.objects.get_id(property["name"])
 
     if logic=="eq":
-        pks = TextProperty.objects.filter(name=name, value=value).values_list("compound__pk",flat=True)
+        pks = TextProperty.objects.filter(property_name_id=name_id, value=value).values_list("compound__pk",flat=True)
     elif logic=="contains":
-        pks = TextProperty.objects.filter(name=name, value__contains=value).values_list("compound__pk",flat=True)
+        pks = TextProperty.objects.filter(property_name_id=name_id, value__contains=value).values_list("compound__pk",flat=True)
         
     else:
         return
@@ -112,4 +114,31 @@ def _compoundNameFilter(QS, nameFilter):
         QS.add(Q(compound__endswith=value),Q.AND)
         #compounds = compounds.filter(compound__endswith=value)
     
-    return
\ No newline at end of file
+    return
+
+def process_projection(compounds, projection=None):
+    """
+        Inputs:
+          - compounds:  QuerySet containing the compounds to be returned
+          - projection: An optional list of property names to include in the output, e.g.
+                        projection = ["Band gap", "Density"]
+                        If None, all the properties are included.
+                        If empty, only the compound names are returned.
+        Output:
+          - compounds:  The same QuerySet, with the (requested) properties prefetched,
+                        so that serializing it doesn't make one query per compound.
+    """
+    scalars = ScalarProperty.objects.select_related("property_name")
+    texts = TextProperty.objects.select_related("property_name")
+
+    if projection is not None:
+        # only fetch the property rows that were actually requested.
+        # an empty __in never reaches the database.
+        name_ids = PropertyName.objects.get_ids(projection)
+        scalars = scalars.filter(property_name_id__in=name_ids)
+        texts = texts.filter(property_name_id__in=name_ids)
+
+    return compounds.prefetch_related(
+        Prefetch("scalarproperty", queryset=scalars),
+        Prefetch("textproperty", queryset=texts),
+    )
@@ -0,0 +1,58 @@
+import time
+from contextlib import contextmanager
+
+from django.db import OperationalError, connection, transaction
+
+
+class QueryTimeout(Exception):
+    """
+      Raised when the statements run inside a time_budget take longer than allowed.
+    """
+    pass
+
+
+@contextmanager
+def time_budget(seconds):
+    """
+      Abort any SQL statement that is still running after the given number of seconds
+      (counted from entering the block), raising QueryTimeout.
+
+        - SQLite:     a progress handler interrupts the statement once the deadline has passed
+        - PostgreSQL: statement_timeout, set for the duration of a transaction
+        - others:     no limit is enforced
+
+      If seconds is None the block runs without a limit.
+    """
+    if not seconds:
+        yield
+        return
+
+    if connection.vendor == "sqlite":
+        deadline = time.monotonic() + seconds
+        connection.ensure_connection()
+        # the handler is called every 1000 virtual machine instructions,
+        # returning True makes SQLite abort the current statement
+        connection.connection.set_progress_handler(lambda: time.monotonic() > deadline, 1000)
+        try:
+            yield
+        except OperationalError as e:
+            if time.monotonic() > deadline:
+                raise QueryTimeout() from e
+            raise
+        finally:
+            connection.connection.set_progress_handler(None, 1000)
+
+    elif connection.vendor == "postgresql":
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL statement_timeout = %s", [int(seconds * 1000)])
+                yield
+        except OperationalError as e:
+            # the error raised when the statement_timeout expires is a QueryCanceled
+            if "statement timeout" in str(e):
+                raise QueryTimeout() from e
+            raise
+
+    else:
+        yield
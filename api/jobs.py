@@ -0,0 +1,177 @@
+import json
+import multiprocessing
+import signal
+import sys
+import time
+from datetime import timedelta
+
+from django import db
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from api.models import ImportJob
+from api.serializers import CompoundSerializer
+
+
+class LostJob(Exception):
+    """
+      Raised when the job was claimed again by another worker (after our lease expired),
+      the chunk being saved is rolled back and the job left to the new worker.
+    """
+    pass
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def requeue_stale_jobs():
+    """
+      Put back in the queue the running jobs whose worker didn't send a heartbeat
+      for more than IMPORT_JOB_LEASE seconds (most likely because it died).
+    """
+    expired = timezone.now() - timedelta(seconds=_setting("IMPORT_JOB_LEASE", 300))
+    return ImportJob.objects.filter(status=ImportJob.RUNNING, heartbeat_at__lt=expired).update(
+        status=ImportJob.PENDING
+    )
+
+
+def claim_job():
+    """
+      Pick the oldest pending job and mark it as running.
+      The database is the queue: the conditional UPDATE only succeeds for one worker,
+      so two processes can never end up importing the same job.
+    """
+    requeue_stale_jobs()
+    candidates = ImportJob.objects.filter(status=ImportJob.PENDING).order_by("pk").values_list("pk", flat=True)
+    for pk in candidates[:10]:
+        now = timezone.now()
+        claimed = ImportJob.objects.filter(pk=pk, status=ImportJob.PENDING).update(
+            status=ImportJob.RUNNING, heartbeat_at=now, attempts=F("attempts") + 1,
+            # a requeued job keeps its original start time
+            started_at=Coalesce(F("started_at"), Value(now)),
+        )
+        if claimed:
+            return ImportJob.objects.get(pk=pk)
+    return None
+
+
+def run_job(job, chunk_size=None):
+    """
+      Validate the compounds in the job payload with the CompoundSerializer,
+      and save the valid ones one chunk (and one transaction) at a time.
+      Progress and per-row errors are written back to the job in the same transaction as each chunk,
+      so a requeued job resumes right after the last chunk that was saved.
+    """
+    if chunk_size is None:
+        chunk_size = _setting("IMPORT_JOB_CHUNK_SIZE", 500)
+
+    rows = json.loads(job.payload)
+    errors = json.loads(job.errors)
+    inserted = job.inserted
+    # only the worker holding the latest claim can write to the job
+    mine = ImportJob.objects.filter(pk=job.pk, status=ImportJob.RUNNING, attempts=job.attempts)
+
+    for start in range(job.processed, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        valid = []
+        chunk_errors = []
+        for i, row in enumerate(chunk):
+            compound_serializer = CompoundSerializer(data=row)
+            if compound_serializer.is_valid():
+                valid.append(compound_serializer)
+            else:
+                chunk_errors.append({"row": start + i, "errors": compound_serializer.errors})
+
+        with transaction.atomic():
+            for compound_serializer in valid:
+                compound_serializer.save()
+            updated = mine.update(
+                processed=start + len(chunk), inserted=inserted + len(valid),
+                errors=json.dumps(errors + chunk_errors), heartbeat_at=timezone.now()
+            )
+            if not updated:
+                raise LostJob()
+        inserted += len(valid)
+        errors += chunk_errors
+
+    mine.update(status=ImportJob.DONE, finished_at=timezone.now())
+
+
+def work(poll_interval=None, chunk_size=None):
+    """
+      Main loop of a worker process: claim a job, import it, repeat.
+      Sleeps for poll_interval seconds whenever the queue is empty.
+    """
+    if poll_interval is None:
+        poll_interval = _setting("IMPORT_JOB_POLL_INTERVAL", 1.0)
+
+    while True:
+        db.close_old_connections()
+        try:
+            job = claim_job()
+        except db.OperationalError:
+            # e.g. SQLite's "database is locked" while another worker is writing, try again later
+            time.sleep(poll_interval)
+            continue
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+
+        mine = ImportJob.objects.filter(pk=job.pk, status=ImportJob.RUNNING, attempts=job.attempts)
+        try:
+            run_job(job, chunk_size)
+        except LostJob:
+            pass
+        except db.OperationalError:
+            # a database hiccup is not the job's fault: put it back in the queue,
+            # or leave it to the lease if even that fails
+            try:
+                mine.update(status=ImportJob.PENDING)
+            except db.OperationalError:
+                pass
+            time.sleep(poll_interval)
+        except Exception as e:
+            # keep the row errors collected so far, and add the one that stopped the job
+            try:
+                errors = json.loads(ImportJob.objects.get(pk=job.pk).errors)
+                errors.append({"row": None, "errors": str(e)})
+                mine.update(status=ImportJob.FAILED, finished_at=timezone.now(), errors=json.dumps(errors))
+            except db.OperationalError:
+                pass
+
+
+def start_workers(processes=None, poll_interval=None, chunk_size=None):
+    """
+      Start a pool of local worker processes, and restart any of them that dies.
+    """
+    if processes is None:
+        processes = _setting("IMPORT_JOB_WORKERS", 2)
+
+    # the children inherit the loaded Django apps from this process, rather than setting them up again,
+    # so they are always forked whatever the default start method of the platform is
+    context = multiprocessing.get_context("fork")
+
+    def start():
+        # database connections must not be shared with the child processes
+        db.connections.close_all()
+        w = context.Process(target=work, args=(poll_interval, chunk_size), daemon=True)
+        w.start()
+        return w
+
+    # stop the workers along with this process, on Ctrl-C as well as on SIGTERM
+    signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+    workers = [start() for _ in range(processes)]
+    try:
+        while True:
+            time.sleep(1.0)
+            for i, w in enumerate(workers):
+                if not w.is_alive():
+                    w.join()
+                    workers[i] = start()
+    finally:
+        for w in workers:
+            w.terminate()
@@ -0,0 +1,35 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from api.export import EXPORT_FORMATS, export_stream
+
+
+class Command(BaseCommand):
+    """
+        Usage:          python manage.py export_compounds [--output csv|ndjson] [--file PATH] [--chunk-size N]
+        Action:         Stream all the compounds in the database to a file (or stdout),
+                        in the same formats as /data/export/
+    """
+    help = "Export all the compounds in the database, as CSV or gzip compressed NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", choices=sorted(EXPORT_FORMATS), default="ndjson",
+                            help="output format (default: ndjson)")
+        parser.add_argument("--file", default=None,
+                            help="destination file (default: stdout)")
+        parser.add_argument("--chunk-size", type=int, default=None,
+                            help="compounds fetched per query (default: EXPORT_CHUNK_SIZE)")
+
+    def handle(self, *args, **options):
+        stream = export_stream(options["output"], options["chunk_size"])
+        if options["file"] is None:
+            self._write(sys.stdout.buffer, stream)
+        else:
+            with open(options["file"], "wb") as f:
+                self._write(f, stream)
+
+    def _write(self, f, stream):
+        for data in stream:
+            f.write(data)
+        f.flush()
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from api.jobs import start_workers
+
+
+class Command(BaseCommand):
+    """
+        Usage:          python manage.py import_worker [--processes N] [--chunk-size N] [--poll-interval S]
+        Action:         Start a pool of local worker processes that import
+                        the jobs submitted to /data/jobs/.
+    """
+    help = "Start a pool of worker processes that import the jobs submitted to /data/jobs/"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=None,
+                            help="number of worker processes (default: IMPORT_JOB_WORKERS)")
+        parser.add_argument("--chunk-size", type=int, default=None,
+                            help="compounds saved per transaction (default: IMPORT_JOB_CHUNK_SIZE)")
+        parser.add_argument("--poll-interval", type=float, default=None,
+                            help="seconds to wait when there are no pending jobs (default: IMPORT_JOB_POLL_INTERVAL)")
+
+    def handle(self, *args, **options):
+        start_workers(options["processes"], options["poll_interval"], options["chunk_size"])
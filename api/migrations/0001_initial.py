@@ -0,0 +1,46 @@
+# Generated by Django 3.2.25 on 2026-10-19 19:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Compound',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('compound', models.CharField(max_length=127)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TextProperty',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=127)),
+                ('value', models.CharField(max_length=127)),
+                ('compound', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='textproperty', to='api.compound')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ScalarProperty',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=127)),
+                ('value', models.FloatField()),
+                ('compound', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scalarproperty', to='api.compound')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,88 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def names_to_ids(apps, schema_editor):
+    """
+      Create a PropertyName for each distinct name in the property tables,
+      and point every property row to it.
+    """
+    PropertyName = apps.get_model('api', 'PropertyName')
+    for model_name in ('ScalarProperty', 'TextProperty'):
+        Property = apps.get_model('api', model_name)
+        for name in Property.objects.values_list('name', flat=True).distinct():
+            property_name, _ = PropertyName.objects.get_or_create(name=name)
+            Property.objects.filter(name=name).update(property_name=property_name)
+
+
+def ids_to_names(apps, schema_editor):
+    for model_name in ('ScalarProperty', 'TextProperty'):
+        Property = apps.get_model('api', model_name)
+        for property_name in apps.get_model('api', 'PropertyName').objects.all():
+            Property.objects.filter(property_name=property_name).update(name=property_name.name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_importjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertyName',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=127, unique=True)),
+            ],
+        ),
+        # add the foreign keys as nullable first, fill them in, and only then drop the names
+        migrations.AddField(
+            model_name='scalarproperty',
+            name='property_name',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='scalarproperty', to='api.propertyname'),
+        ),
+        migrations.AddField(
+            model_name='textproperty',
+            name='property_name',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='textproperty', to='api.propertyname'),
+        ),
+        # the names are made nullable too, so that the migration can be reversed
+        migrations.AlterField(
+            model_name='scalarproperty',
+            name='name',
+            field=models.CharField(max_length=127, null=True),
+        ),
+        migrations.AlterField(
+            model_name='textproperty',
+            name='name',
+            field=models.CharField(max_length=127, null=True),
+        ),
+        migrations.RunPython(names_to_ids, ids_to_names),
+        migrations.RemoveField(
+            model_name='scalarproperty',
+            name='name',
+        ),
+        migrations.RemoveField(
+            model_name='textproperty',
+            name='name',
+        ),
+        migrations.AlterField(
+            model_name='scalarproperty',
+            name='property_name',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='scalarproperty', to='api.propertyname'),
+        ),
+        migrations.AlterField(
+            model_name='textproperty',
+            name='property_name',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='textproperty', to='api.propertyname'),
+        ),
+        migrations.AddIndex(
+            model_name='scalarproperty',
+            index=models.Index(fields=['property_name', 'value'], name='api_scalarp_propert_fa7b83_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='textproperty',
+            index=models.Index(fields=['property_name', 'value'], name='api_textpro_propert_f0d394_idx'),
+        ),
+    ]
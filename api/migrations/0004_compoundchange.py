@@ -0,0 +1,38 @@
+# Generated by Django 3.2.25 on 2026-10-19 19:13
+
+from django.db import migrations, models
+
+
+def log_existing_compounds(apps, schema_editor):
+    """
+      The compounds created before the change log existed are logged as inserted, in pk order,
+      so that a replica syncing from since=0 gets all of them.
+    """
+    Compound = apps.get_model('api', 'Compound')
+    CompoundChange = apps.get_model('api', 'CompoundChange')
+    batch = []
+    for pk in Compound.objects.order_by('pk').values_list('pk', flat=True).iterator():
+        batch.append(CompoundChange(compound_id=pk, action='upsert'))
+        if len(batch) == 1000:
+            CompoundChange.objects.bulk_create(batch)
+            batch = []
+    CompoundChange.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_propertyname'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompoundChange',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('compound_id', models.IntegerField()),
+                ('action', models.CharField(choices=[('upsert', 'Upsert'), ('delete', 'Delete')], max_length=15)),
+            ],
+        ),
+        migrations.RunPython(log_existing_compounds, migrations.RunPython.noop),
+    ]
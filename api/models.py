@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 
 # Create your models here.
 class Compound(models.Model):
@@ -22,6 +22,57 @@ class Compound(models.Model):
       return props
 
 
+class PropertyNameManager(models.Manager):
+    """
+      Keeps a process-local cache of the name -> id mapping of the property names,
+      so that resolving a name on ingest and in the filters doesn't need a query.
+      Property names are never deleted (or renamed), so the cached ids never go stale:
+      the admin only shows them read-only, and the property ForeignKeys PROTECT them.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._ids = {}
+
+    def _remember(self, name, pk):
+        # only cache the id once it's committed, a rolled back insert must not end up in the cache
+        transaction.on_commit(lambda: self._ids.__setitem__(name, pk))
+
+    def get_id(self, name, create=False):
+        """
+          Return the id of the property name, or None if it doesn't exist (and create is False).
+        """
+        if name in self._ids:
+            return self._ids[name]
+        if create:
+            pk = self.get_or_create(name=name)[0].pk
+        else:
+            pk = self.filter(name=name).values_list("pk", flat=True).first()
+            if pk is None:
+                return None
+        self._remember(name, pk)
+        return pk
+
+    def get_ids(self, names):
+        """
+          Return the ids of the property names that exist, ignoring the others.
+        """
+        ids = [self.get_id(name) for name in names]
+        return [pk for pk in ids if pk is not None]
+
+
+class PropertyName(models.Model):
+    """
+      The names of the properties are repeated on each property row,
+      storing them once here lets the property tables (and their indexes) hold a small integer instead.
+    """
+    name = models.CharField(max_length=127, unique=True)
+
+    objects = PropertyNameManager()
+
+    def __str__(self):
+      return "{}".format(self.name)
+
+
 class BaseProperty(models.Model):
     """
       This is an abstract class, that is never actually used in the code.
@@ -29,10 +80,21 @@ class BaseProperty(models.Model):
       of whichever other type of property we will want to add in the future.
     """
     compound = models.ForeignKey(Compound, related_name='%(class)s', on_delete=models.CASCADE)
-    name = models.CharField(max_length=127)
+    property_name = models.ForeignKey(PropertyName, related_name='%(class)s', on_delete=models.PROTECT)
 
     class Meta:
         abstract = True
+        indexes = [
+            models.Index(fields=['property_name', 'value']),
+        ]
+
+    @property
+    def name(self):
+      """
+        The name of the property as a string, as expected by the PropertySerializer.
+        Select the related property_name when fetching many properties.
+      """
+      return self.property_name.name
 
     def __str__(self):
       return "{} - {}".format(self.compound, self.name)
@@ -49,3 +111,61 @@ class TextProperty(BaseProperty):
     def __str__(self):
       return "{} - {}: {}".format(self.compound, self.name, self.value)
 
+
+
+class ImportJob(models.Model):
+    """
+      A bulk import submitted to /data/jobs/.
+      The payload is stored as it was received, and is validated and saved
+      in chunks by the worker processes (see api/jobs.py), which use this table as their queue.
+    """
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    )
+
+    status = models.CharField(max_length=15, choices=STATUS_CHOICES, default=PENDING, db_index=True)
+    # JSON encoded list of compounds, in the same format as the /data/batchadd/ body
+    payload = models.TextField()
+    total = models.IntegerField(default=0)
+    processed = models.IntegerField(default=0)
+    inserted = models.IntegerField(default=0)
+    # JSON encoded list of {"row": index, "errors": ...} for the rows that failed validation
+    errors = models.TextField(default="[]")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # refreshed by the worker after each chunk: a running job without a recent heartbeat
+    # lost its worker, and is put back in the queue (see IMPORT_JOB_LEASE)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    # incremented each time a worker claims the job, only the latest claim can write to it
+    attempts = models.IntegerField(default=0)
+
+    def __str__(self):
+      return "Job {} - {}: {}/{}".format(self.pk, self.status, self.processed, self.total)
+
+
+class CompoundChange(models.Model):
+    """
+      Append-only log of the changes to the compounds, read by /data/changes/
+      The (monotonic) primary key is the token clients use to ask for the changes since their last sync.
+    """
+    UPSERT = "upsert"
+    DELETE = "delete"
+    ACTION_CHOICES = (
+        (UPSERT, "Upsert"),
+        (DELETE, "Delete"),
+    )
+
+    # a plain integer rather than a ForeignKey, the entry must outlive the compound
+    compound_id = models.IntegerField()
+    action = models.CharField(max_length=15, choices=ACTION_CHOICES)
+
+    def __str__(self):
+      return "{} - {}: {}".format(self.pk, self.action, self.compound_id)
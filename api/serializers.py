@@ -1,7 +1,15 @@
 
+import json
+import math
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
-from api.models import Compound, ScalarProperty, TextProperty
+
+from api.models import Compound, PropertyName, ScalarProperty, TextProperty, ImportJob
 from api.utils import sanitize_value
+from api.changes import record_upsert
 
 
 class PropertySerializer(serializers.Serializer):
@@ -48,16 +56,20 @@ class CompoundSerializer(serializers.ModelSerializer):
             When we save the CompoundSerializer, we need to store not only
             the Compound Model, but also any Property attached to it.
             Overriding the create methods allows us to keep the code in the View clean and simple.
+            The insertion is also logged for /data/changes/ , in the same transaction.
         """
-        c = Compound(compound=validated_data["compound"])
-        c.save()
-        for prop in validated_data["properties"]:
-            value = sanitize_value(prop["value"])
-            if isinstance(value, float):
-                p = ScalarProperty(name=prop["name"], value=value, compound=c)
-            else:
-                p = TextProperty(name=prop["name"], value=value, compound=c)
-            p.save()
+        with transaction.atomic():
+            c = Compound(compound=validated_data["compound"])
+            c.save()
+            for prop in validated_data["properties"]:
+                value = sanitize_value(prop["value"])
+                name_id = PropertyName.objects.get_id(prop["name"], create=True)
+                if isinstance(value, float):
+                    p = ScalarProperty(property_name_id=name_id, value=value, compound=c)
+                else:
+                    p = TextProperty(property_name_id=name_id, value=value, compound=c)
+                p.save()
+            record_upsert(c)
         return c
 
 
@@ -67,4 +79,101 @@ class QuerySerializer(serializers.Serializer):
     """
     compound = CompoundNameSerializer(required=False)
     properties = PropertyQuerySerializer(required=False, many=True)
+    # names of the properties to include in the response,
+    # an empty list returns the compound names only
+    projection = serializers.ListField(child=serializers.CharField(), required=False)
+    # maximum number of compounds to return, capped by SEARCH_MAX_RESULTS
+    limit = serializers.IntegerField(required=False, min_value=1)
+
+
+
+class PropertyTargetSerializer(serializers.Serializer):
+    """
+        Properties portion of a /data/similar request body
+    """
+    name = serializers.CharField()
+    value = serializers.FloatField()
+    weight = serializers.FloatField(default=1.0, min_value=0.0)
+
+    def validate_value(self, value):
+        if not math.isfinite(value):
+            raise serializers.ValidationError("A valid finite number is required.")
+        return value
+
+    def validate_weight(self, value):
+        if not math.isfinite(value):
+            raise serializers.ValidationError("A valid finite number is required.")
+        return value
+
+
+class SimilarSerializer(serializers.Serializer):
+    """
+        Serializer for the request body of /data/similar/
+    """
+    properties = PropertyTargetSerializer(many=True, allow_empty=False)
+    # capped like the results of /data/search/
+    k = serializers.IntegerField(default=10, min_value=1, max_value=getattr(settings, "SEARCH_MAX_RESULTS", None))
+    metric = serializers.ChoiceField(choices=("l2", "normalized"), default="l2")
+    missing = serializers.ChoiceField(choices=("ignore", "exclude"), default="ignore")
+
+
+class ChangedCompoundSerializer(CompoundSerializer):
+    """
+        A Compound in the /data/changes/ response body,
+        with its id so that replicas can match it to their copy
+    """
+    class Meta(CompoundSerializer.Meta):
+        fields = ('id', 'compound', 'properties')
+
+
+class ChangesQuerySerializer(serializers.Serializer):
+    """
+        Serializer for the query parameters of /data/changes/
+    """
+    since = serializers.IntegerField(default=0, min_value=0)
+    limit = serializers.IntegerField(required=False, min_value=1)
+
+
+class ChangesSerializer(serializers.Serializer):
+    """
+        Serializer for the response body of /data/changes/
+    """
+    since = serializers.IntegerField()
+    next = serializers.IntegerField()
+    more = serializers.BooleanField()
+    compounds = ChangedCompoundSerializer(many=True)
+    deleted = serializers.ListField(child=serializers.IntegerField())
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    """
+        ModelSerializer of the ImportJob Model, used in
+        /data/jobs/ , /data/jobs/<id>/
+    """
+    failed = serializers.SerializerMethodField()
+    throughput = serializers.SerializerMethodField()
+    errors = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ImportJob
+        fields = ('id', 'status', 'total', 'processed', 'inserted', 'failed', 'throughput',
+                  'errors', 'created_at', 'started_at', 'finished_at')
+        read_only_fields = fields
+
+    def get_failed(self, job):
+        return job.processed - job.inserted
+
+    def get_throughput(self, job):
+        """
+            Compounds processed per second since the job was picked up by a worker.
+        """
+        if job.started_at is None:
+            return None
+        end = job.finished_at or timezone.now()
+        elapsed = (end - job.started_at).total_seconds()
+        if elapsed <= 0:
+            return None
+        return job.processed / elapsed
 
+    def get_errors(self, job):
+        return json.loads(job.errors)
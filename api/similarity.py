@@ -0,0 +1,127 @@
+import numpy as np
+
+from api.models import CompoundChange, PropertyName, ScalarProperty
+
+
+class PropertyMatrix(object):
+    """
+      Dense compound x property matrix of all the ScalarProperty values in the database.
+      Missing values are stored as NaN.
+
+        - compound_ids: primary keys of the compounds, one per row
+        - names:        names of the properties, one per column
+        - values:       the (compounds x properties) float matrix
+        - scale:        standard deviation of each column, used by the normalized distance
+    """
+    def __init__(self, rows):
+        if len(rows) == 0:
+            self.compound_ids = np.zeros(0, dtype=int)
+            self.names = []
+            self.values = np.zeros((0, 0))
+            self.scale = np.zeros(0)
+            return
+
+        compound_ids, name_ids, values = zip(*rows)
+        self.compound_ids, row_index = np.unique(np.array(compound_ids), return_inverse=True)
+        name_ids, col_index = np.unique(np.array(name_ids), return_inverse=True)
+        names = dict(PropertyName.objects.filter(pk__in=name_ids.tolist()).values_list("pk", "name"))
+        self.names = [names[pk] for pk in name_ids.tolist()]
+
+        self.values = np.full((len(self.compound_ids), len(self.names)), np.nan)
+        self.values[row_index, col_index] = np.array(values, dtype=float)
+
+        scale = np.nanstd(self.values, axis=0)
+        # a constant column doesn't discriminate between compounds, don't blow it up
+        scale[~(scale > 0)] = 1.0
+        self.scale = scale
+
+    def columns(self, names):
+        index = {name: i for i, name in enumerate(self.names)}
+        return np.array([index[name] for name in names], dtype=int)
+
+
+# process-local cache of the matrix, together with the version of the data it was built from
+_cache = {"version": None, "matrix": None}
+
+
+def _data_version():
+    """
+      The latest entry of the change log (see api/changes.py), which every write to the compounds
+      and their properties appends to, no matter which process made it.
+      A single primary key lookup, so it's cheap to check on every search.
+    """
+    return CompoundChange.objects.order_by("-pk").values_list("pk", flat=True).first()
+
+
+def get_matrix():
+    version = _data_version()
+    if _cache["matrix"] is None or _cache["version"] != version:
+        rows = list(ScalarProperty.objects.values_list("compound_id", "property_name_id", "value"))
+        _cache["matrix"] = PropertyMatrix(rows)
+        _cache["version"] = version
+    return _cache["matrix"]
+
+
+def nearest_compounds(matrix, target, k, metric="l2", missing="ignore"):
+    """
+        Inputs:
+          - matrix:     PropertyMatrix
+          - target:     A list of properties describing the reference point, with the following format:
+                        target = [
+                            {
+                                "name": "Band gap",
+                                "value": 2.5,
+                                "weight": 1.0
+                            },
+                            ...
+                        ]
+          - k:          Maximum number of compounds to return
+          - metric:     "l2" for the weighted euclidean distance of the raw values,
+                        "normalized" to divide each property by its standard deviation first
+          - missing:    What to do with compounds that lack some of the target properties:
+                        "ignore" computes the distance over the properties they have,
+                        rescaled by the fraction of the total weight that was available;
+                        "exclude" leaves them out of the results.
+                        Compounds that have none of the target properties (with a non-zero weight)
+                        are never returned.
+        Output:
+          - (compound_ids, distances): The k closest compounds, closest first
+    """
+    cols = matrix.columns([t["name"] for t in target])
+    point = np.array([t["value"] for t in target], dtype=float)
+    weights = np.array([t["weight"] for t in target], dtype=float)
+
+    sub = matrix.values[:, cols]
+    diff = sub - point
+    if metric == "normalized":
+        diff = diff / matrix.scale[cols]
+
+    present = ~np.isnan(sub)
+    available = present.astype(float) @ weights
+    total = weights.sum()
+
+    # an overflow only makes the distance infinite, see below
+    with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+        squared = np.where(present, weights * diff**2, 0.0).sum(axis=1)
+        distances = np.sqrt(squared * total / available)
+
+    if missing == "exclude":
+        keep = present.all(axis=1)
+    else:
+        keep = present.any(axis=1)
+    if total > 0:
+        # compounds that only have zero-weight properties can't be measured at all
+        keep &= available > 0
+    else:
+        # a zero total weight leaves all the distances undefined, treat them as ties instead
+        distances = np.zeros_like(distances)
+    # values far apart enough can overflow, drop those compounds rather than return an infinite distance
+    keep &= np.isfinite(distances)
+    distances[~keep] = np.inf
+
+    k = min(k, int(keep.sum()))
+    if k == 0:
+        return matrix.compound_ids[:0], distances[:0]
+    closest = np.argpartition(distances, k - 1)[:k]
+    closest = closest[np.argsort(distances[closest], kind="stable")]
+    return matrix.compound_ids[closest], distances[closest]
@@ -8,5 +8,10 @@ urlpatterns = [
     url(r'^batchadd/$', views.AddCompounds.as_view()),
     url(r'^clear/$', views.RemoveAll.as_view()),
     url(r'^search/$', views.SearchCompounds.as_view()),
+    url(r'^similar/$', views.SimilarCompounds.as_view()),
+    url(r'^export/$', views.ExportCompounds.as_view()),
+    url(r'^changes/$', views.CompoundChanges.as_view()),
+    url(r'^jobs/$', views.CreateImportJob.as_view()),
+    url(r'^jobs/(?P<pk>[0-9]+)/$', views.ImportJobDetail.as_view()),
 ]
 urlpatterns = format_suffix_patterns(urlpatterns)
\ No newline at end of file
@@ -1,10 +1,19 @@
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
 from rest_framework.response import Response
 from rest_framework import status, generics
 
-from .serializers import CompoundSerializer, QuerySerializer
-from .models import Compound, ScalarProperty, TextProperty
-from .filters import process_filter
+import json
+
+from .serializers import CompoundSerializer, QuerySerializer, SimilarSerializer, ImportJobSerializer
+from .serializers import ChangesQuerySerializer, ChangesSerializer
+from .models import Compound, ScalarProperty, TextProperty, ImportJob
+from .filters import process_filter, process_projection
+from .similarity import get_matrix, nearest_compounds
+from .export import EXPORT_FORMATS, export_stream
+from .guards import QueryTimeout, time_budget
+from .changes import delete_compounds, read_changes
 
 
 class AddCompound(generics.GenericAPIView):
@@ -72,7 +81,8 @@ class RemoveAll(generics.GenericAPIView):
 
     def post(self, request, *args, **kwargs):
         compounds = self.get_queryset()
-        compounds.delete()
+        # log the deletions for /data/changes/
+        delete_compounds(compounds)
         return Response(None, status=status.HTTP_204_NO_CONTENT)
 
 
@@ -84,6 +94,12 @@ class SearchCompounds(generics.GenericAPIView):
         Response Body:  CompoundSerializer (array)
         Action:         Given a set of filter rules on the name and properties,
                         return all the compounds in the database that match.
+                        If a projection is given, only the listed properties are returned.
+        Limits:         Searches that would return more than SEARCH_MAX_COST compounds are rejected (400),
+                        and searches running longer than SEARCH_TIME_BUDGET seconds are aborted (503).
+                        At most SEARCH_MAX_RESULTS compounds (or the requested limit) are returned:
+                        the X-Result-Count header has the total number of matches,
+                        and X-Result-Truncated is set when the response doesn't include them all.
     """
     serializer_class = QuerySerializer
 
@@ -92,6 +108,8 @@ class SearchCompounds(generics.GenericAPIView):
         compounds = Compound.objects.all()
         # and filter them down according to the filter in the request body
         compounds = process_filter(compounds, filter_serializer.validated_data)
+        # and only fetch the properties that will end up in the response
+        compounds = process_projection(compounds, filter_serializer.validated_data.get("projection"))
         return compounds
 
     def post(self, request, *args, **kwargs):
@@ -99,10 +117,160 @@ class SearchCompounds(generics.GenericAPIView):
         # and return a 400 response if validation fails
         filter_serializer = self.serializer_class(data=request.data)
         filter_serializer.is_valid(raise_exception=True)
-        # get the compounds that match the filter
-        compounds = self.get_queryset(filter_serializer)
-        # serialize and return them
-        output = CompoundSerializer(compounds, many=True)
-        return Response(output.data, status=status.HTTP_200_OK)
 
-        
\ No newline at end of file
+        max_cost = getattr(settings, "SEARCH_MAX_COST", None)
+        max_results = getattr(settings, "SEARCH_MAX_RESULTS", None)
+        limit = filter_serializer.validated_data.get("limit")
+        if limit is not None and (max_results is None or limit < max_results):
+            max_results = limit
+
+        try:
+            with time_budget(getattr(settings, "SEARCH_TIME_BUDGET", None)):
+                # get the compounds that match the filter
+                compounds = self.get_queryset(filter_serializer)
+                # count them before loading any of them, and refuse the searches that would load too many
+                # (a truncated search only loads max_results of them, however many match)
+                count = compounds.count()
+                served = count if max_results is None else min(count, max_results)
+                if max_cost is not None and served > max_cost:
+                    return Response({"detail": "The search would return {} compounds, more than the {} allowed. "
+                                               "Please narrow down the filter.".format(served, max_cost)},
+                                    status=status.HTTP_400_BAD_REQUEST)
+                truncated = max_results is not None and count > max_results
+                if truncated:
+                    compounds = compounds.order_by("pk")[:max_results]
+                # serialize them (this is where the properties are fetched)
+                output = CompoundSerializer(compounds, many=True).data
+        except QueryTimeout:
+            return Response({"detail": "The search took too long and was aborted. "
+                                       "Please narrow down the filter."},
+                            status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        response = Response(output, status=status.HTTP_200_OK)
+        response["X-Result-Count"] = str(count)
+        if truncated:
+            response["X-Result-Truncated"] = "true"
+        return response
+
+
+class SimilarCompounds(generics.GenericAPIView):
+    """
+        Api Endpoint:   /data/similar/
+        HTTP Methods:   POST
+        Request Body:   SimilarSerializer
+        Response Body:  CompoundSerializer (array), with an additional "distance"
+        Action:         Given target values (and optional weights) for a set of scalar properties,
+                        return the k compounds closest to them, closest first.
+    """
+    serializer_class = SimilarSerializer
+
+    def post(self, request, *args, **kwargs):
+        # validate request body against the serializer,
+        # and return a 400 response if validation fails
+        similar_serializer = self.serializer_class(data=request.data)
+        similar_serializer.is_valid(raise_exception=True)
+        query = similar_serializer.validated_data
+
+        matrix = get_matrix()
+        unknown = set(p["name"] for p in query["properties"]) - set(matrix.names)
+        if unknown:
+            return Response({"properties": ["Unknown scalar property: {}".format(name) for name in sorted(unknown)]},
+                            status=status.HTTP_400_BAD_REQUEST)
+        pks, distances = nearest_compounds(matrix, query["properties"], query["k"],
+                                           query["metric"], query["missing"])
+
+        # fetch the compounds, and put them back in order of distance
+        compounds = process_projection(Compound.objects.filter(pk__in=pks.tolist())).in_bulk()
+        output = []
+        for pk, distance in zip(pks.tolist(), distances.tolist()):
+            # deleted since the matrix was built
+            if pk not in compounds:
+                continue
+            data = CompoundSerializer(compounds[pk]).data
+            data["distance"] = distance
+            output.append(data)
+        return Response(output, status=status.HTTP_200_OK)
+
+
+class ExportCompounds(generics.GenericAPIView):
+    """
+        Api Endpoint:   /data/export/?output=<csv|ndjson>
+        HTTP Methods:   GET
+        Request Body:   Empty
+        Response Body:  All the compounds in the database, either as CSV
+                        or as gzip compressed NDJSON (one CompoundSerializer per line, default)
+        Action:         Stream the whole dataset, a chunk of compounds at a time,
+                        without ever loading it all in memory.
+    """
+    serializer_class = None
+    queryset = []
+
+    def get(self, request, *args, **kwargs):
+        output = request.query_params.get("output", "ndjson")
+        if output not in EXPORT_FORMATS:
+            return Response({"output": ["Expected one of: {}".format(", ".join(sorted(EXPORT_FORMATS)))]},
+                            status=status.HTTP_400_BAD_REQUEST)
+        content_type, extension, _ = EXPORT_FORMATS[output]
+        response = StreamingHttpResponse(export_stream(output), content_type=content_type)
+        response["Content-Disposition"] = 'attachment; filename="compounds.{}"'.format(extension)
+        return response
+
+
+class CompoundChanges(generics.GenericAPIView):
+    """
+        Api Endpoint:   /data/changes/?since=<token>&limit=<n>
+        HTTP Methods:   GET
+        Request Body:   Empty
+        Response Body:  ChangesSerializer
+        Action:         Return the compounds inserted or updated, and the ids of the ones deleted,
+                        since the given token (0 for all of them).
+                        At most limit (or CHANGES_PAGE_SIZE) changes are returned at a time:
+                        pass the "next" token of the response as "since" to get the following ones.
+    """
+    serializer_class = ChangesSerializer
+    queryset = []
+
+    def get(self, request, *args, **kwargs):
+        # validate the query parameters against the serializer,
+        # and return a 400 response if validation fails
+        query_serializer = ChangesQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        page_size = getattr(settings, "CHANGES_PAGE_SIZE", 1000)
+        limit = min(query_serializer.validated_data.get("limit", page_size), page_size)
+        changes = read_changes(query_serializer.validated_data["since"], limit)
+        return Response(self.serializer_class(changes).data, status=status.HTTP_200_OK)
+
+
+class CreateImportJob(generics.GenericAPIView):
+    """
+        Api Endpoint:   /data/jobs/
+        HTTP Methods:   POST
+        Request Body:   CompoundSerializer (array)
+        Response Body:  ImportJobSerializer
+        Action:         Store the list of Compounds and return right away.
+                        Validation and saving is done in the background by the
+                        import workers (python manage.py import_worker).
+    """
+    serializer_class = ImportJobSerializer
+    queryset = ImportJob.objects.all()
+
+    def post(self, request, *args, **kwargs):
+        # the individual compounds are validated by the workers,
+        # here we only make sure we have been given a list of them
+        if not isinstance(request.data, list):
+            return Response({"non_field_errors": ["Expected a list of compounds."]},
+                            status=status.HTTP_400_BAD_REQUEST)
+        job = ImportJob.objects.create(payload=json.dumps(request.data), total=len(request.data))
+        return Response(self.serializer_class(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class ImportJobDetail(generics.RetrieveAPIView):
+    """
+        Api Endpoint:   /data/jobs/<id>/
+        HTTP Methods:   GET
+        Request Body:   Empty
+        Response Body:  ImportJobSerializer
+        Action:         Report the status, progress, throughput and per-row errors of an import job.
+    """
+    serializer_class = ImportJobSerializer
+    queryset = ImportJob.objects.all()
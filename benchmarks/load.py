@@ -0,0 +1,215 @@
+"""
+Concurrent load generator for the Web API, built on the helpers in tests/api_utils.py
+
+A number of worker threads, each with its own pooled requests.Session, send a weighted mix of
+/data/add/, /data/batchadd/ and /data/search/ requests, at a target total rate (or as fast as possible).
+At the end it reports, for each endpoint: requests, throughput, error rate and p50/p95/p99 latency.
+
+The compounds sent to /data/add/ and /data/batchadd/ are read from tests/data.csv,
+so the database grows while the test runs.
+
+Usage (from the root of the repository):
+    # against a running server (tests/env.py BASE_URL by default)
+    python benchmarks/load.py --workers 8 --rate 200 --duration 30 --mix search=8,add=1,batchadd=1
+    # against a server started in this process, on a throw away database
+    python benchmarks/load.py --local [--settings settings.api_only]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import requests
+
+from tests.api_utils import api_add, api_batchadd, api_search
+from tests.env import BASE_URL
+from tests.local_utils import csv_to_compounds
+
+SEARCH_FILTERS = [
+    {},
+    {
+        "compound": {
+            "value": "Pb",
+            "logic": "contains"
+        }
+    },
+    {
+        "compound": {
+            "value": "Se",
+            "logic": "contains"
+        },
+        "properties": [
+            {
+                "name": "Band gap",
+                "value": "3",
+                "logic": "lt"
+            },
+            {
+                "name": "Color",
+                "value": "Gray",
+                "logic": "contains"
+            }
+        ]
+    },
+]
+
+# name: function sending one request of that kind
+OPERATIONS = {
+    "add": lambda base_url, session, compounds, batch_size:
+        api_add(base_url, random.choice(compounds), session=session),
+    "batchadd": lambda base_url, session, compounds, batch_size:
+        api_batchadd(base_url, random.sample(compounds, min(batch_size, len(compounds))), session=session),
+    "search": lambda base_url, session, compounds, batch_size:
+        api_search(base_url, random.choice(SEARCH_FILTERS), session=session),
+}
+
+
+def start_local_server(settings_module):
+    """
+      Serve the API from a thread of this process, on a temporary SQLite database.
+      Returns the base url of the server.
+    """
+    os.environ["DJANGO_SETTINGS_MODULE"] = settings_module
+    from django.conf import settings
+    settings.DATABASES["default"]["NAME"] = os.path.join(tempfile.mkdtemp(), "db.sqlite3")
+
+    import django
+    django.setup()
+    from django.core.management import call_command
+    from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+    from django.core.wsgi import get_wsgi_application
+
+    call_command("migrate", verbosity=0)
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadedWSGIServer(("127.0.0.1", 0), QuietHandler)
+    httpd.set_app(get_wsgi_application())
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return "http://127.0.0.1:{}".format(httpd.server_port)
+
+
+def parse_mix(mix):
+    """
+      "search=8,add=1" -> (["search", "add"], [8.0, 1.0])
+    """
+    names, weights = [], []
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        if name not in OPERATIONS:
+            raise ValueError("Unknown operation '{}', expected one of: {}".format(name, ", ".join(sorted(OPERATIONS))))
+        names.append(name)
+        weights.append(float(weight or 1))
+    return names, weights
+
+
+class Schedule(object):
+    """
+      Hands out the send time of each request, so that all the workers together
+      keep the target rate. With a rate of 0 requests are sent as fast as possible.
+    """
+    def __init__(self, rate, duration, n_requests):
+        self.rate = rate
+        self.n_requests = n_requests
+        self.start = time.perf_counter()
+        self.end = self.start + duration if duration else None
+        self.sent = 0
+        self.lock = threading.Lock()
+
+    def next(self):
+        """
+          Wait for the next slot, return False when the test is over.
+        """
+        with self.lock:
+            if self.n_requests is not None and self.sent >= self.n_requests:
+                return False
+            slot = self.start + self.sent / self.rate if self.rate else time.perf_counter()
+            self.sent += 1
+        if self.end is not None and slot >= self.end:
+            return False
+        delay = slot - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+
+def worker(base_url, schedule, names, weights, compounds, batch_size, results):
+    session = requests.Session()
+    while schedule.next():
+        name = random.choices(names, weights)[0]
+        start = time.perf_counter()
+        try:
+            response = OPERATIONS[name](base_url, session, compounds, batch_size)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        # list.append is atomic, no need for a lock
+        results.append((name, time.perf_counter() - start, ok))
+    session.close()
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def report(results, elapsed):
+    print("{:<10} {:>9} {:>10} {:>8} {:>10} {:>10} {:>10}".format(
+        "endpoint", "requests", "req/s", "errors", "p50 ms", "p95 ms", "p99 ms"))
+    for name in sorted(set(r[0] for r in results)) + ["total"]:
+        rows = [r for r in results if name in (r[0], "total")]
+        latencies = [r[1] for r in rows]
+        errors = sum(1 for r in rows if not r[2])
+        print("{:<10} {:>9} {:>10.1f} {:>7.1f}% {:>10.1f} {:>10.1f} {:>10.1f}".format(
+            name, len(rows), len(rows) / elapsed, 100.0 * errors / len(rows),
+            _percentile(latencies, 0.50)*1e3, _percentile(latencies, 0.95)*1e3, _percentile(latencies, 0.99)*1e3))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=BASE_URL, help="url of the API (default: tests/env.py BASE_URL)")
+    parser.add_argument("--local", action="store_true", help="start the API in this process, on a temporary database")
+    parser.add_argument("--settings", default="settings.settings", help="settings module of the --local server")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent workers (default: 4)")
+    parser.add_argument("--rate", type=float, default=0, help="target total requests per second (default: 0, unlimited)")
+    parser.add_argument("--duration", type=float, default=10, help="seconds to run for (default: 10)")
+    parser.add_argument("--requests", type=int, default=None, help="stop after this many requests")
+    parser.add_argument("--mix", default="search=8,add=1,batchadd=1",
+                        help="weights of the operations (default: search=8,add=1,batchadd=1)")
+    parser.add_argument("--batch-size", type=int, default=50, help="compounds per /data/batchadd/ request (default: 50)")
+    parser.add_argument("--csv", default=os.path.join(BASE_DIR, "tests", "data.csv"), help="compounds to upload")
+    args = parser.parse_args()
+
+    names, weights = parse_mix(args.mix)
+    compounds = csv_to_compounds(args.csv)
+    base_url = start_local_server(args.settings) if args.local else args.base_url
+
+    results = []
+    schedule = Schedule(args.rate, args.duration, args.requests)
+    threads = [
+        threading.Thread(target=worker, args=(base_url, schedule, names, weights, compounds, args.batch_size, results))
+        for _ in range(args.workers)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - schedule.start
+
+    if not results:
+        print("No requests were sent")
+        return
+    print("{} workers, {:.1f} s against {}".format(args.workers, elapsed, base_url))
+    report(results, elapsed)
+
+
+if __name__ == "__main__":
+    main()
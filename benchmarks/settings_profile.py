@@ -0,0 +1,137 @@
+"""
+Compare the default settings (settings.settings) with the lean API-only profile (settings.api_only).
+
+For each profile it reports:
+  - startup: time to import Django, run django.setup() and load the WSGI application and the urls,
+             measured in a fresh interpreter (plus the total wall time of that process)
+  - latency: time per request of /data/search/ through the full middleware stack,
+             on an in-memory database filled with the compounds in tests/data.csv
+
+Usage (from the root of the repository):
+    python benchmarks/settings_profile.py [--runs 10] [--requests 500]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILES = ["settings.settings", "settings.api_only"]
+
+SEARCH_FILTER = {
+    "compound": {
+        "value": "Se",
+        "logic": "contains"
+    },
+    "properties": [
+        {
+            "name": "Band gap",
+            "value": "3",
+            "logic": "lt"
+        }
+    ]
+}
+
+
+def _startup_child():
+    start = time.perf_counter()
+    import django
+    django.setup()
+    from settings.wsgi import application
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+    print(json.dumps({"startup": time.perf_counter() - start}))
+
+
+def _latency_child(n_requests):
+    from django.conf import settings
+    settings.DATABASES["default"]["NAME"] = ":memory:"
+    import django
+    django.setup()
+    from django.core.management import call_command
+    from django.test import Client
+    from api.serializers import CompoundSerializer
+    from tests.local_utils import csv_to_compounds
+
+    call_command("migrate", run_syncdb=True, verbosity=0)
+    compounds = CompoundSerializer(data=csv_to_compounds(os.path.join(BASE_DIR, "tests", "data.csv")), many=True)
+    compounds.is_valid(raise_exception=True)
+    compounds.save()
+
+    client = Client()
+    body = json.dumps(SEARCH_FILTER)
+    # warm up
+    for _ in range(10):
+        client.post("/data/search/", body, content_type="application/json")
+
+    timings = []
+    for _ in range(n_requests):
+        start = time.perf_counter()
+        response = client.post("/data/search/", body, content_type="application/json")
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 200
+    print(json.dumps({"latency": timings}))
+
+
+def _run_child(profile, *args):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=profile)
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child"] + list(args),
+                         cwd=BASE_DIR, env=env, check=True, stdout=subprocess.PIPE).stdout
+    wall = time.perf_counter() - start
+    return json.loads(out.decode().strip().splitlines()[-1]), wall
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="fresh processes used to time the startup")
+    parser.add_argument("--requests", type=int, default=500, help="requests used to time the latency")
+    parser.add_argument("--child", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        sys.path.insert(0, BASE_DIR)
+        if args.child:
+            _latency_child(int(args.child[0]))
+        else:
+            _startup_child()
+        return
+
+    results = {}
+    for profile in PROFILES:
+        startup, wall = [], []
+        for _ in range(args.runs):
+            out, w = _run_child(profile)
+            startup.append(out["startup"])
+            wall.append(w)
+        latency = _run_child(profile, str(args.requests))[0]["latency"]
+        results[profile] = {
+            "startup": _percentile(startup, 0.5),
+            "process": _percentile(wall, 0.5),
+            "p50": _percentile(latency, 0.5),
+            "p95": _percentile(latency, 0.95),
+            "mean": sum(latency) / len(latency),
+        }
+
+    print("{:<20} {:>12} {:>12} {:>12} {:>12} {:>12}".format(
+        "profile", "startup ms", "process ms", "mean ms", "p50 ms", "p95 ms"))
+    for profile in PROFILES:
+        r = results[profile]
+        print("{:<20} {:>12.1f} {:>12.1f} {:>12.3f} {:>12.3f} {:>12.3f}".format(
+            profile, r["startup"]*1e3, r["process"]*1e3, r["mean"]*1e3, r["p50"]*1e3, r["p95"]*1e3))
+
+    base, lean = results[PROFILES[0]], results[PROFILES[1]]
+    print()
+    print("startup saved:     {:.1f} ms".format((base["startup"] - lean["startup"])*1e3))
+    print("per request saved: {:.3f} ms (mean)".format((base["mean"] - lean["mean"])*1e3))
+
+
+if __name__ == "__main__":
+    main()
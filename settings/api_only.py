@@ -0,0 +1,42 @@
+"""
+Lean Django settings for the production API nodes.
+
+The API doesn't use the admin, users, sessions or messages, nor the browsable API,
+so this profile only loads the apps and middleware that the endpoints actually need.
+Use it by setting DJANGO_SETTINGS_MODULE=settings.api_only
+
+Run benchmarks/settings_profile.py to compare it with settings.settings
+"""
+
+from settings.settings import *
+
+DEBUG = False
+
+INSTALLED_APPS = [
+    'rest_framework',
+    'corsheaders',
+    'api',
+]
+
+MIDDLEWARE = [
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+ROOT_URLCONF = 'settings.api_urls'
+
+# nothing is rendered through templates without the browsable API
+TEMPLATES = []
+
+AUTH_PASSWORD_VALIDATORS = []
+
+REST_FRAMEWORK = {
+    # JSON in, JSON out: no browsable API, no form parsing
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+    'DEFAULT_PARSER_CLASSES': ['rest_framework.parsers.JSONParser'],
+    # the endpoints are public, skip authenticating every request
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.AllowAny'],
+    'UNAUTHENTICATED_USER': None,
+}
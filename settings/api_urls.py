@@ -0,0 +1,9 @@
+"""URL Configuration of the settings.api_only profile
+
+Same as settings/urls.py, without the admin site.
+"""
+from django.conf.urls import url, include
+
+urlpatterns = [
+    url(r'^data/', include('api.urls')),
+]
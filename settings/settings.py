@@ -126,3 +126,28 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/2.0/howto/static-files/
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 STATIC_URL = '/static/'
+
+
+# Background imports submitted to /data/jobs/ (see api/jobs.py)
+IMPORT_JOB_WORKERS = 2
+IMPORT_JOB_CHUNK_SIZE = 500
+IMPORT_JOB_POLL_INTERVAL = 1.0
+# seconds without a heartbeat after which a running job is considered lost, and requeued
+IMPORT_JOB_LEASE = 300
+
+# Compounds fetched per query by /data/export/ and the export_compounds command (see api/export.py)
+EXPORT_CHUNK_SIZE = 1000
+
+# Guards on /data/search/ (see api/guards.py), set any of them to None to disable it
+# searches that would return more compounds than this are rejected
+# (only matters when SEARCH_MAX_RESULTS is larger, or None)
+SEARCH_MAX_COST = 1000000
+# at most this many compounds are returned, the response is marked as truncated
+SEARCH_MAX_RESULTS = 10000
+# seconds of SQL time allowed to a single search
+SEARCH_TIME_BUDGET = 10.0
+# let browser clients read the result headers of /data/search/
+CORS_EXPOSE_HEADERS = ['X-Result-Count', 'X-Result-Truncated']
+
+# Maximum number of changes returned by a single call to /data/changes/ (see api/changes.py)
+CHANGES_PAGE_SIZE = 1000
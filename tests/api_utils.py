@@ -1,21 +1,48 @@
 import requests
 
-def api_clear(baseUrl):
-    r = requests.post(baseUrl+"/data/clear/")
+# every helper takes an optional requests.Session, to reuse its connections
+# (by default each call opens a new one)
+
+def api_clear(baseUrl, session=requests):
+    r = session.post(baseUrl+"/data/clear/")
+    return r
+
+
+def api_add(baseUrl, compound, session=requests):
+    r = session.post(baseUrl+"/data/add/", json=compound)
     return r
 
 
-def api_add(baseUrl, compound):
-    r = requests.post(baseUrl+"/data/add/", json=compound)
+def api_batchadd(baseUrl, compounds, session=requests):
+    r = session.post(baseUrl+"/data/batchadd/", json=compounds)
     return r
 
 
-def api_batchadd(baseUrl, compounds):
-    r = requests.post(baseUrl+"/data/batchadd/", json=compounds)
+def api_search(baseUrl, filter_dict, session=requests):
+    r = session.post(baseUrl+"/data/search/", json=filter_dict)
     return r
 
 
-def api_search(baseUrl, filter_dict):
-    r = requests.post(baseUrl+"/data/search/", json=filter_dict)
+def api_similar(baseUrl, target, session=requests):
+    r = session.post(baseUrl+"/data/similar/", json=target)
     return r
 
+
+def api_export(baseUrl, output, session=requests):
+    r = session.get(baseUrl+"/data/export/", params={"output": output})
+    return r
+
+
+def api_changes(baseUrl, since, limit=None, session=requests):
+    r = session.get(baseUrl+"/data/changes/", params={"since": since, "limit": limit})
+    return r
+
+
+def api_createjob(baseUrl, compounds, session=requests):
+    r = session.post(baseUrl+"/data/jobs/", json=compounds)
+    return r
+
+
+def api_getjob(baseUrl, job_id, session=requests):
+    r = session.get(baseUrl+"/data/jobs/{}/".format(job_id))
+    return r
@@ -0,0 +1,64 @@
+import unittest
+from tests.env import BASE_URL, CSV_FILE
+
+from tests.local_utils import csv_to_compounds
+from tests.api_utils import api_add, api_batchadd, api_changes, api_clear
+
+class TestApiChanges(unittest.TestCase):
+
+    def _latest(self):
+        # page through all the changes so far, and return the last token
+        token = 0
+        while True:
+            r = api_changes(BASE_URL, token)
+            self.assertEqual(r.status_code, 200)
+            token = r.json()["next"]
+            if not r.json()["more"]:
+                return token
+
+    def test_changes(self):
+        token = self._latest()
+        compound = csv_to_compounds(CSV_FILE)[0]
+        r = api_add(BASE_URL, compound)
+        self.assertEqual(r.status_code, 201)
+
+        # the new compound is the only change
+        changes = api_changes(BASE_URL, token).json()
+        self.assertEqual(len(changes["compounds"]), 1)
+        self.assertEqual(changes["compounds"][0]["compound"], compound["compound"])
+        self.assertEqual(changes["deleted"], [])
+        self.assertFalse(changes["more"])
+        compound_id = changes["compounds"][0]["id"]
+
+        # after a clear it shows up among the deleted ones
+        token = changes["next"]
+        r = api_clear(BASE_URL)
+        self.assertEqual(r.status_code, 204)
+        changes = api_changes(BASE_URL, token).json()
+        self.assertEqual(changes["compounds"], [])
+        self.assertIn(compound_id, changes["deleted"])
+
+        # and there is nothing new after that
+        changes = api_changes(BASE_URL, changes["next"]).json()
+        self.assertEqual(changes["compounds"], [])
+        self.assertEqual(changes["deleted"], [])
+
+    def test_changes_pages(self):
+        token = self._latest()
+        compounds = csv_to_compounds(CSV_FILE)[:5]
+        r = api_batchadd(BASE_URL, compounds)
+        self.assertEqual(r.status_code, 201)
+
+        received = []
+        more = True
+        while more:
+            changes = api_changes(BASE_URL, token, limit=2).json()
+            self.assertLessEqual(len(changes["compounds"]), 2)
+            received += [c["compound"] for c in changes["compounds"]]
+            token, more = changes["next"], changes["more"]
+        self.assertEqual(received, [c["compound"] for c in compounds])
+
+    def test_changes_wrong(self):
+        # we expect a 400 response from the API, since the token is not a number
+        r = api_changes(BASE_URL, "abc")
+        self.assertEqual(r.status_code, 400)
@@ -0,0 +1,52 @@
+import gzip
+import io
+import json
+import unittest
+from tests.env import BASE_URL, CSV_FILE
+
+from tests.local_utils import csv_to_compounds
+from tests.api_utils import api_batchadd, api_clear, api_export
+
+class TestApiExport(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """
+          This setUp is in common for all the test cases below, and it's only execuded once
+          We are ensuring all the entries are in the database.
+        """
+        cls.local_compounds = csv_to_compounds(CSV_FILE)
+        # clear the DB so we are sure that the local compounds are the same as the remote ones
+        r = api_clear(BASE_URL)
+        assert r.status_code == 204
+        r = api_batchadd(BASE_URL, cls.local_compounds)
+        assert r.status_code == 201
+
+    def _key(self, compound):
+        # scalar values come back formatted as floats, compare them as such
+        props = []
+        for p in compound["properties"]:
+            try:
+                value = float(p["value"])
+            except ValueError:
+                value = p["value"]
+            props.append((p["name"], value))
+        return (compound["compound"], tuple(sorted(props, key=str)))
+
+    def test_export_csv(self):
+        response = api_export(BASE_URL, "csv")
+        self.assertEqual(response.status_code, 200)
+        # the export can be read back with the same routine used for the input file
+        exported = csv_to_compounds(io.StringIO(response.text))
+        self.assertEqual(sorted(map(self._key, exported)), sorted(map(self._key, self.local_compounds)))
+
+    def test_export_ndjson(self):
+        response = api_export(BASE_URL, "ndjson")
+        self.assertEqual(response.status_code, 200)
+        lines = gzip.decompress(response.content).decode().splitlines()
+        exported = [json.loads(line) for line in lines]
+        self.assertEqual(sorted(map(self._key, exported)), sorted(map(self._key, self.local_compounds)))
+
+    def test_export_wrong(self):
+        response = api_export(BASE_URL, "xml")
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,49 @@
+import time
+import unittest
+from tests.env import BASE_URL, CSV_FILE
+
+from tests.local_utils import csv_to_compounds
+from tests.api_utils import api_createjob, api_getjob
+
+class TestApiJobs(unittest.TestCase):
+
+    def _wait(self, job_id, timeout=30):
+        # the import is done by the workers in the background, poll until it's over
+        start = time.time()
+        while time.time() - start < timeout:
+            job = api_getjob(BASE_URL, job_id).json()
+            if job["status"] in ("done", "failed"):
+                return job
+            time.sleep(0.5)
+        self.fail("The import job did not complete in time")
+
+    def test_job(self):
+        compounds = csv_to_compounds(CSV_FILE)
+        response = api_createjob(BASE_URL, compounds)
+        self.assertEqual(response.status_code, 202)
+        job = self._wait(response.json()["id"])
+        self.assertEqual(job["status"], "done")
+        self.assertEqual(job["processed"], len(compounds))
+        self.assertEqual(job["inserted"], len(compounds))
+        self.assertEqual(job["errors"], [])
+
+    def test_job_errors(self):
+        compounds = csv_to_compounds(CSV_FILE)[:5]
+        # the third compound is missing its name
+        compounds[2] = {"properties": compounds[2]["properties"]}
+        response = api_createjob(BASE_URL, compounds)
+        self.assertEqual(response.status_code, 202)
+        job = self._wait(response.json()["id"])
+        self.assertEqual(job["status"], "done")
+        self.assertEqual(job["inserted"], 4)
+        self.assertEqual(job["failed"], 1)
+        self.assertEqual(job["errors"][0]["row"], 2)
+
+    def test_job_wrong(self):
+        # we expect a 400 response from the API, since the body is not a list of compounds
+        response = api_createjob(BASE_URL, {"compound": "Pb"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_job_missing(self):
+        response = api_getjob(BASE_URL, 123456789)
+        self.assertEqual(response.status_code, 404)
@@ -1,3 +1,4 @@
+import os
 import unittest
 from tests.env import BASE_URL, CSV_FILE
 
@@ -28,6 +29,7 @@ class TestApiSearch(unittest.TestCase):
         # in the real world we should make sure that each compound is actually the same
         self.assertEqual(api_res.status_code, 200)
         self.assertEqual(len(api_res.json()), len(local_res))
+        self.assertNotIn("X-Result-Truncated", api_res.headers)
     
     def test_search_name(self):
         the_filter = {
@@ -69,6 +71,61 @@ class TestApiSearch(unittest.TestCase):
         self.assertEqual(api_res.status_code, 200)
         self.assertEqual(len(api_res.json()), len(local_res))
 
+    def test_search_unknown_property(self):
+        the_filter = {
+            "properties": [
+                {
+                    "name": "Not a property",
+                    "value": "3",
+                    "logic": "lt"
+                }
+            ]
+        }
+        api_res = api_search(BASE_URL,the_filter)
+        local_res = local_search(self.local_compounds,the_filter)
+        self.assertEqual(api_res.status_code, 200)
+        self.assertEqual(len(api_res.json()), len(local_res))
+        self.assertEqual(len(api_res.json()), 0)
+
+    def test_search_projection(self):
+        the_filter = {
+            "compound": {
+                "value": "Se",
+                "logic": "contains"
+            },
+            "projection": ["Band gap"]
+        }
+        api_res = api_search(BASE_URL,the_filter)
+        local_res = local_search(self.local_compounds,the_filter)
+        self.assertEqual(api_res.status_code, 200)
+        self.assertEqual(len(api_res.json()), len(local_res))
+        # only the requested property should be in the response
+        for c in api_res.json():
+            self.assertEqual([p["name"] for p in c["properties"]], ["Band gap"])
+
+    def test_search_names_only(self):
+        the_filter = {
+            "projection": []
+        }
+        api_res = api_search(BASE_URL,the_filter)
+        local_res = local_search(self.local_compounds,the_filter)
+        self.assertEqual(api_res.status_code, 200)
+        self.assertEqual(len(api_res.json()), len(local_res))
+        for c in api_res.json():
+            self.assertEqual(c["properties"], [])
+
+    def test_search_limit(self):
+        the_filter = {
+            "limit": 5
+        }
+        api_res = api_search(BASE_URL,the_filter)
+        local_res = local_search(self.local_compounds,the_filter)
+        self.assertEqual(api_res.status_code, 200)
+        # only the first 5 compounds are returned, but the headers tell how many matched
+        self.assertEqual(len(api_res.json()), 5)
+        self.assertEqual(int(api_res.headers["X-Result-Count"]), len(local_res))
+        self.assertEqual(api_res.headers["X-Result-Truncated"], "true")
+
     def test_search_wrong(self):
         the_filter = {
             "compound": {
@@ -81,3 +138,70 @@ class TestApiSearch(unittest.TestCase):
         self.assertEqual(api_res.status_code, 400)
 
 
+class TestSearchGuards(unittest.TestCase):
+    """
+      The guards of /data/search/ depend on the settings, so rather than going through the server
+      these tests run the API in this process, on an in-memory SQLite database.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings.settings")
+        import django
+        django.setup()
+        from django.db import connection
+        from django.test import Client
+        from django.test.utils import setup_test_environment
+        setup_test_environment()
+        cls.old_name = connection.creation.create_test_db(verbosity=0)
+        cls.client = Client()
+        cls.local_compounds = csv_to_compounds(CSV_FILE)
+        r = cls.client.post("/data/batchadd/", cls.local_compounds, content_type="application/json")
+        assert r.status_code == 201
+
+    @classmethod
+    def tearDownClass(cls):
+        from django.db import connection
+        from django.test.utils import teardown_test_environment
+        connection.creation.destroy_test_db(cls.old_name, verbosity=0)
+        teardown_test_environment()
+
+    def search(self, the_filter, **settings):
+        from django.test import override_settings
+        with override_settings(**settings):
+            return self.client.post("/data/search/", the_filter, content_type="application/json")
+
+    def test_search_max_cost(self):
+        # we expect a 400 response from the API, since the search would return every compound
+        api_res = self.search({}, SEARCH_MAX_COST=1, SEARCH_MAX_RESULTS=None)
+        self.assertEqual(api_res.status_code, 400)
+        # but a search that only returns a few of them is fine
+        api_res = self.search({"limit": 1}, SEARCH_MAX_COST=1, SEARCH_MAX_RESULTS=None)
+        self.assertEqual(api_res.status_code, 200)
+        self.assertEqual(len(api_res.json()), 1)
+        self.assertEqual(int(api_res["X-Result-Count"]), len(self.local_compounds))
+
+    def test_search_time_budget(self):
+        # we expect a 503 response from the API, since no search can run in so little time
+        api_res = self.search({}, SEARCH_TIME_BUDGET=0.0001)
+        self.assertEqual(api_res.status_code, 503)
+        # and the next search, with the default budget, isn't affected
+        api_res = self.search({})
+        self.assertEqual(api_res.status_code, 200)
+        self.assertEqual(len(api_res.json()), len(self.local_compounds))
+
+    def test_time_budget(self):
+        from django.db import connection
+        from api.guards import QueryTimeout, time_budget
+        slow_query = ("WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 100000000) "
+                      "SELECT count(*) FROM c")
+        with self.assertRaises(QueryTimeout):
+            with time_budget(0.01):
+                with connection.cursor() as cursor:
+                    cursor.execute(slow_query)
+                    cursor.fetchone()
+        # the budget ends with the block
+        with time_budget(None):
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                self.assertEqual(cursor.fetchone(), (1,))
@@ -0,0 +1,125 @@
+import unittest
+from tests.env import BASE_URL, CSV_FILE
+
+from tests.local_utils import csv_to_compounds, _get_prop
+from tests.api_utils import api_add, api_batchadd, api_clear, api_similar
+
+class TestApiSimilar(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """
+          This setUp is in common for all the test cases below, and it's only execuded once
+          We are ensuring all the entries are in the database.
+        """
+        cls.local_compounds = csv_to_compounds(CSV_FILE)
+        # clear the DB so we are sure that the local compounds are the same as the remote ones
+        r = api_clear(BASE_URL)
+        assert r.status_code == 204
+        r = api_batchadd(BASE_URL, cls.local_compounds)
+        assert r.status_code == 201
+
+    def test_similar(self):
+        target = {
+            "properties": [
+                {
+                    "name": "Band gap",
+                    "value": "2.0"
+                }
+            ],
+            "k": 5
+        }
+        api_res = api_similar(BASE_URL, target)
+        self.assertEqual(api_res.status_code, 200)
+        # with a single property the distance is just the absolute difference
+        local_distances = sorted(abs(float(_get_prop(c, "Band gap")["value"]) - 2.0) for c in self.local_compounds)
+        api_distances = [c["distance"] for c in api_res.json()]
+        self.assertEqual(len(api_distances), 5)
+        for api_d, local_d in zip(api_distances, local_distances):
+            self.assertAlmostEqual(api_d, local_d)
+
+    def test_similar_missing(self):
+        compound = {
+            "compound": "Xx1",
+            "properties": [
+                {"name": "Band gap", "value": "2.0"},
+                {"name": "Density", "value": "5.0"}
+            ]
+        }
+        r = api_add(BASE_URL, compound)
+        self.assertEqual(r.status_code, 201)
+        target = {
+            "properties": [
+                {"name": "Band gap", "value": "2.0"},
+                {"name": "Density", "value": "5.0", "weight": "2.0"}
+            ],
+            "metric": "normalized",
+            "missing": "exclude"
+        }
+        # only the compound with both properties is left
+        api_res = api_similar(BASE_URL, target)
+        self.assertEqual(api_res.status_code, 200)
+        self.assertEqual([c["compound"] for c in api_res.json()], ["Xx1"])
+        self.assertAlmostEqual(api_res.json()[0]["distance"], 0.0)
+
+        target["missing"] = "ignore"
+        api_res = api_similar(BASE_URL, target)
+        self.assertEqual(api_res.status_code, 200)
+        self.assertEqual(len(api_res.json()), 10)
+
+    def test_similar_zero_weight(self):
+        compound = {
+            "compound": "Yy1",
+            "properties": [
+                {"name": "Density", "value": "100.0"}
+            ]
+        }
+        r = api_add(BASE_URL, compound)
+        self.assertEqual(r.status_code, 201)
+        target = {
+            "properties": [
+                {"name": "Band gap", "value": "2.0"},
+                {"name": "Density", "value": "100.0", "weight": "0.0"}
+            ]
+        }
+        # the compound only has the property that doesn't count, it can't be a match
+        api_res = api_similar(BASE_URL, target)
+        self.assertEqual(api_res.status_code, 200)
+        self.assertNotIn("Yy1", [c["compound"] for c in api_res.json()])
+
+    def test_similar_wrong(self):
+        target = {
+            "properties": [
+                {"name": "Not a property", "value": "2.0"}
+            ]
+        }
+        # we expect a 400 response from the API, since the property doesn't exist
+        api_res = api_similar(BASE_URL, target)
+        self.assertEqual(api_res.status_code, 400)
+
+        # values and weights must be finite numbers
+        for prop in ({"name": "Band gap", "value": "nan"},
+                     {"name": "Band gap", "value": "inf"},
+                     {"name": "Band gap", "value": "2.0", "weight": "inf"}):
+            api_res = api_similar(BASE_URL, {"properties": [prop]})
+            self.assertEqual(api_res.status_code, 400)
+
+        # so many results can't be returned
+        target = {
+            "properties": [
+                {"name": "Band gap", "value": "2.0"}
+            ],
+            "k": 10**9
+        }
+        api_res = api_similar(BASE_URL, target)
+        self.assertEqual(api_res.status_code, 400)
+
+        # a target this far away overflows the distance of every compound, none of them can be ranked
+        target = {
+            "properties": [
+                {"name": "Band gap", "value": "1e308"}
+            ]
+        }
+        api_res = api_similar(BASE_URL, target)
+        self.assertEqual(api_res.status_code, 200)
+        self.assertEqual(api_res.json(), [])